@@ -1,9 +1,13 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
 import os
+import logging
+import pickle
+import build_db
 
 # --- 1. CONFIGURATION ---
+logger = logging.getLogger(__name__)
+
 if os.path.exists("airbus_logo.png"):
     app_icon = "airbus_logo.png"
 else:
@@ -16,17 +20,8 @@ st.set_page_config(
 )
 
 # --- 2. HEADER FUNCTION ---
-def render_header():
-    # Using a single line for style to prevent any multi-line string issues
-    st.markdown("""
-    <style>
-        .tech-header-container { position: fixed; top: 0; left: 0; width: 100%; height: 3.5rem; background-color: #00205B; color: #FFFFFF; z-index: 50; display: flex; align-items: center; justify-content: space-between; padding: 0 40px; box-shadow: 0 4px 6px rgba(0,0,0,0.3); font-family: Helvetica, Arial, sans-serif; border-bottom: 3px solid #95A5A6; }
-        .block-container { padding-top: 5rem !important; }
-        header[data-testid="stHeader"] { background-color: transparent; }
-        .tech-text { font-family: 'Consolas', 'Courier New', monospace; font-size: 0.9rem; color: #00FF00; display: flex; gap: 20px; letter-spacing: 1px; }
-        .ref-badge { background-color: #FFFFFF; color: #00205B; padding: 2px 8px; border-radius: 2px; font-weight: bold; font-size: 0.8rem; }
-        @media (max-width: 700px) { .tech-header-container { padding: 0 15px; } .tech-text { font-size: 0.75rem; gap: 10px; } }
-        
+# Static markup, built once at import instead of on every rerun
+_ECAM_STYLE = """
         /* ECAM PANEL STYLES */
         .ecam-panel { background-color: #000000; border: 3px solid #444; border-radius: 6px; padding: 15px 20px; margin-bottom: 20px; font-family: 'Consolas', 'Courier New', monospace; box-shadow: inset 0 0 30px rgba(0, 0, 0, 0.8); display: flex; flex-direction: column; align-items: center; }
         .ecam-header { width: 100%; display: flex; justify-content: space-between; align-items: flex-end; border-bottom: 2px solid #555; padding-bottom: 8px; margin-bottom: 12px; }
@@ -38,7 +33,22 @@ def render_header():
         .tank-name { color: #00FFFF; font-size: 1rem; margin-bottom: 4px; font-weight: bold; }
         .tank-val { color: #00FF00; font-weight: bold; font-size: 1.5rem; }
         .ecam-act { margin-top: 15px; border-top: 1px dashed #333; padding-top: 8px; width: 100%; text-align: center; font-size: 1.1rem; font-weight: bold; }
-    </style>
+"""
+
+_HEADER_HTML = """
+    <style>
+        .tech-header-container { position: fixed; top: 0; left: 0; width: 100%; height: 3.5rem; background-color: #00205B; color: #FFFFFF; z-index: 50; display: flex; align-items: center; justify-content: space-between; padding: 0 40px; box-shadow: 0 4px 6px rgba(0,0,0,0.3); font-family: Helvetica, Arial, sans-serif; border-bottom: 3px solid #95A5A6; }
+        .block-container { padding-top: 5rem !important; }
+        header[data-testid="stHeader"] { background-color: transparent; }
+        .tech-text { font-family: 'Consolas', 'Courier New', monospace; font-size: 0.9rem; color: #00FF00; display: flex; gap: 20px; letter-spacing: 1px; }
+        .ref-badge { background-color: #FFFFFF; color: #00205B; padding: 2px 8px; border-radius: 2px; font-weight: bold; font-size: 0.8rem; }
+        @media (max-width: 700px) { .tech-header-container { padding: 0 15px; } .tech-text { font-size: 0.75rem; gap: 10px; } }
+        /* TANK SELECTOR: the horizontal radio is drawn as a tab bar */
+        .block-container div[data-testid="stRadio"] div[role="radiogroup"] { gap: 0; width: 100%; border-bottom: 1px solid rgba(128, 128, 128, 0.3); }
+        .block-container div[data-testid="stRadio"] label[data-baseweb="radio"] { margin: 0; padding: 8px 16px; border-bottom: 2px solid transparent; cursor: pointer; }
+        .block-container div[data-testid="stRadio"] label[data-baseweb="radio"] > div:first-child { display: none; }
+        .block-container div[data-testid="stRadio"] label[data-baseweb="radio"]:has(input:checked) { border-bottom-color: #FF4B4B; color: #FF4B4B; }
+""" + _ECAM_STYLE + """    </style>
     <div class="tech-header-container">
         <div style="display:flex;align-items:center;gap:10px;">
             <div class="ref-badge">A321neo</div>
@@ -50,61 +60,162 @@ def render_header():
             <span>MLI CHECK</span>
         </div>
     </div>
-    """, unsafe_allow_html=True)
+"""
+
+# ECAM panel body, filled per rerun with format_map.
+# NOTE: This HTML string is purposely left-aligned (no indentation) to fix display bugs
+_ECAM_TEMPLATE = """
+<div class="ecam-panel">
+<div class="ecam-header">
+<div style="display:flex; flex-direction:column;">
+<span class="ecam-label-fob">FOB:</span>
+</div>
+<div style="display:flex; align-items:baseline;">
+<span class="ecam-total">{total:,}</span>
+<span class="ecam-unit">KG</span>
+</div>
+</div>
+<div class="ecam-tanks">
+<div class="tank-box">
+<span class="tank-name">LEFT</span>
+<span class="tank-val">{left}</span>
+</div>
+<div class="tank-box">
+<span class="tank-name">CTR</span>
+<span class="tank-val">{center}</span>
+</div>
+<div class="tank-box">
+<span class="tank-name">RIGHT</span>
+<span class="tank-val">{right}</span>
+</div>
+</div>
+<div class="ecam-act" style="color: {act_color};">
+ACT: {act}
+</div>
+</div>
+"""
+
+def render_header():
+    st.markdown(_HEADER_HTML, unsafe_allow_html=True)
 
 render_header()
 st.title("Airbus A321 neo Fuel Calculator")
 st.caption("Magnetic Level Indicator (MLI) Calculation")
 
 # --- 3. DATA LOADER ---
-@st.cache_data
+CACHE_FILE = 'fuel_cache.pkl'
+# A tuple-keyed dict costs a few hundred bytes per row; beyond this, use Arrow scans
+LOOKUP_MAX_ROWS = 1_000_000
+
+# Default selections, resolved once per option list at load time
+def default_pitch_index(pitches):
+    # The last "0"/"1" pitch (e.g. "1.0" -> "1")
+    hits = np.flatnonzero(np.isin(np.char.replace(np.array(pitches, dtype=str), '.0', ''), ["0", "1"]))
+    return int(hits[-1]) if len(hits) else 0
+
+def default_roll_index(rolls):
+    # Level (0.0) when available
+    i = int(np.searchsorted(rolls, 0.0))
+    return i if i < len(rolls) and rolls[i] == 0 else 0
+
+def cache_is_fresh():
+    # The pickle is derived from the Parquet file and from the code below
+    if not os.path.exists(CACHE_FILE) or build_db.is_stale(): return False
+    built = os.path.getmtime(CACHE_FILE)
+    return built >= os.path.getmtime(build_db.PARQUET_FILE) and built >= os.path.getmtime(__file__)
+
+# cache_resource shares one copy across reruns and sessions (no pickling on each hit).
+# The returned frame and lookup dicts are read-only: never mutate them in place.
+@st.cache_resource
 def load_data():
-    file_name = 'Airbus_Fuel_Data.csv'
-    if not os.path.exists(file_name): return None, "File Missing"
+    # Cold start: reuse the pre-built structures instead of re-deriving them
+    if cache_is_fresh():
+        try:
+            with open(CACHE_FILE, 'rb') as f: return pickle.load(f)
+        except Exception: pass
 
     try:
-        db = pd.read_csv(file_name)
-        # Clean Data
-        if 'Roll' in db.columns: 
-            db['Roll'] = pd.to_numeric(db['Roll'], errors='coerce').round(2)
-        if 'Reading' in db.columns:
-            db['Reading'] = pd.to_numeric(db['Reading'], errors='coerce').round(1)
-        if 'Qty' in db.columns:
-            db['Qty'] = pd.to_numeric(db['Qty'], errors='coerce')
-            
-        for col in ['MLI', 'Pitch', 'Tank']:
-            if col in db.columns: 
-                db[col] = db[col].astype(str).str.strip()
-                # Remove "nan" strings if they exist
-                db = db[db[col].str.lower() != 'nan']
-        return db, None
-    except Exception as e:
-        return None, str(e)
-
-df_db, error_msg = load_data()
+        # Parquet carries the cleaned, typed schema; rebuilt from the CSV when stale or unreadable
+        db = build_db.add_keys(build_db.load_table())
 
-# --- 4. SESSION STATE ---
-for k in ['left_qty', 'center_qty', 'right_qty', 'act_qty']:
-    if k not in st.session_state: st.session_state[k] = 0
+        # Sorted once on the composite key: every (Tank, MLI, Pitch) group is a contiguous slice
+        db = db.sort_values(['Tank', 'MLI', 'Pitch', 'Roll_i', 'Reading_i']).reset_index(drop=True)
+        groups = db.groupby(['Tank', 'MLI', 'Pitch'], sort=False, observed=True).indices
+        group_offsets = {k: (idx[0], idx[-1] + 1) for k, idx in sorted(groups.items(), key=lambda kv: kv[1][0])}
 
-# --- 5. LOGIC ---
-def get_fuel_qty(mli, pitch, roll, reading, tank):
-    if df_db is None: return None
-    
-    subset = df_db[
-        (df_db['Tank'] == tank) &
-        (df_db['MLI'] == mli) &
-        (df_db['Pitch'] == pitch) &
-        (np.isclose(df_db['Roll'], roll, atol=0.01))
-    ]
-    exact = subset[np.isclose(subset['Reading'], reading, atol=0.01)]
-    if not exact.empty: return exact.iloc[0]['Qty']
-    return None
-
-if df_db is None:
+        # Exact-match index: queries are a single hash probe. Past LOOKUP_MAX_ROWS the
+        # dict isn't built and the code columns are kept for a scan instead. These
+        # tables may be reused from the sidecar, so whether numba is there to compile
+        # that scan is decided after loading, not here.
+        lookup, codes = None, None
+        if len(db) <= LOOKUP_MAX_ROWS:
+            keys = zip(db['Tank'], db['MLI'], db['Pitch'], db['Roll_i'], db['Reading_i'])
+            lookup = dict(zip(keys, db['Qty'].to_numpy()))
+        else:
+            codes = build_db.code_columns(db)
+
+        # Dropdown options as (options, default index), so the tabs don't re-filter the
+        # frame on every rerun. group_offsets is ordered by row offset, i.e. by the
+        # frame's (numeric) Pitch order, so pitches come out sorted.
+        pitches_by = {}
+        for t, m, p in group_offsets: pitches_by.setdefault((t, m), []).append(p)
+        pitches_by = {k: (tuple(v), default_pitch_index(v)) for k, v in pitches_by.items()}
+        roll_col = db['Roll'].to_numpy()
+        rolls_by = {}
+        for k, (start, end) in group_offsets.items():
+            rolls = np.unique(roll_col[start:end])
+            rolls_by[k] = (tuple(rolls), default_roll_index(rolls))
+        readings_by_key = {k: np.unique(g['Reading'].to_numpy())
+                           for k, g in db.groupby(['Tank', 'MLI', 'Pitch', 'Roll_i'], sort=False, observed=True)}
+        mlis_by_tank = {t: np.unique(g['MLI'].to_numpy()).tolist() for t, g in db.groupby('Tank', observed=True)}
+        tables = (db, lookup, codes, pitches_by, rolls_by, readings_by_key, mlis_by_tank)
+    except Exception:
+        logger.exception("Could not load %s or %s", build_db.PARQUET_FILE, build_db.CSV_FILE)
+        return None
+
+    # Best effort: a read-only filesystem just means no sidecar
+    try:
+        with open(CACHE_FILE, 'wb') as f: pickle.dump(tables, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError: pass
+    return tables
+
+tables = load_data()
+if tables is None:
     st.warning("⚠️ **Database Missing**")
     st.info("Please ensure 'Airbus_Fuel_Data.csv' is uploaded.")
     st.stop()
+df_db, fuel_lookup, code_cols, pitches_by, rolls_by, readings_by_key, mlis_by_tank = tables
+
+# --- 4. SESSION STATE ---
+# Interned session keys for each tank's quantity (whole KG, stored as int)
+QTY_KEYS = {'left': 'left_qty', 'center': 'center_qty', 'right': 'right_qty', 'act': 'act_qty'}
+for k in QTY_KEYS.values():
+    if k not in st.session_state: st.session_state[k] = 0
+
+# --- 5. LOGIC ---
+def roll_key(roll): return int(round(float(roll) * 100))
+def reading_key(reading): return int(round(float(reading) * 10))
+
+# The table is loaded by now; pick the lookup path once (dict, compiled scan, Arrow scan)
+if fuel_lookup is not None:
+    def get_fuel_qty(mli, pitch, roll, reading, tank):
+        return fuel_lookup.get((tank, mli, pitch, roll_key(roll), reading_key(reading)))
+elif code_cols is not None and build_db.find_qty is not None:
+    def get_fuel_qty(mli, pitch, roll, reading, tank):
+        tc, mc, pc = (df_db[c].cat.categories.get_loc(v) for c, v in (('Tank', tank), ('MLI', mli), ('Pitch', pitch)))
+        qty = build_db.find_qty(*code_cols, tc, mc, pc, roll_key(roll), reading_key(reading))
+        return None if qty < 0 else int(qty)
+else:
+    def get_fuel_qty(mli, pitch, roll, reading, tank):
+        return build_db.scan_qty(tank, mli, pitch, roll_key(roll), reading_key(reading))
+
+def batch_lookup(queries):
+    # queries: (tank, mli, pitch, roll, reading) tuples, one per non-empty tank
+    return [get_fuel_qty(mli, pitch, roll, reading, tank) for tank, mli, pitch, roll, reading in queries]
+
+# --- 6. OPTION LISTS ---
+# Options come from the load-time dicts; only tanks with rows have an MLI list
+has_act = 'ACT' in mlis_by_tank
 
 # --- 7. SIDEBAR ---
 with st.sidebar:
@@ -115,23 +226,53 @@ with st.sidebar:
     st.markdown("---")
     st.header("Settings")
     if st.button("Reset All"):
-        for k in ['left_qty', 'center_qty', 'right_qty', 'act_qty']:
+        for k in QTY_KEYS.values():
             st.session_state[k] = 0
         st.rerun()
 
-# --- 8. TOTALIZER PLACEHOLDER ---
-totalizer_container = st.empty()
+# --- 8. TOTALIZER ---
+# The panel HTML is only re-formatted when a tank quantity actually changed;
+# the placeholder still needs filling on every run, so reuse the last string.
+def render_totalizer(slot):
+    totalizer_key = (st.session_state.left_qty, st.session_state.center_qty, st.session_state.right_qty, st.session_state.act_qty)
+    if st.session_state.get('_last_totalizer_key') != totalizer_key:
+        total_fuel = sum(totalizer_key)
+        act_style_color = "#00FF00" if st.session_state.act_qty > 0 else "#555"
+
+        ecam_content = _ECAM_TEMPLATE.format_map({
+            'total': total_fuel, 'act_color': act_style_color,
+            'left': st.session_state.left_qty, 'center': st.session_state.center_qty,
+            'right': st.session_state.right_qty, 'act': st.session_state.act_qty,
+        })
+        st.session_state._last_totalizer_key = totalizer_key
+        st.session_state._last_totalizer_html = ecam_content
+
+    slot.markdown(st.session_state._last_totalizer_html, unsafe_allow_html=True)
 
 # --- 9. INPUT TABS ---
-t1, t2, t3 = st.tabs(["Left Wing", "Center / ACT", "Right Wing"])
+TABS = ["Left Wing", "Center / ACT", "Right Wing"]
+
+# Only the active tab's widgets are drawn, and Streamlit drops the state of widgets
+# that weren't drawn; shadow copies ("_<widget key>") bring the selections back.
+def recall(widget_key, default=None):
+    return st.session_state.get(f"_{widget_key}", default)
 
+def recall_index(widget_key, options, default=0):
+    hits = np.flatnonzero(np.asarray(options, dtype=object) == recall(widget_key))
+    return int(hits[0]) if len(hits) else default
+
+def remember(widget_key, value):
+    st.session_state[f"_{widget_key}"] = value
+    return value
+
+# Renders the selectors only; returns the lookup query plus a slot for its result
 def render_mli_input(label, key, tank_name):
     st.subheader(f"{label}")
     
-    if st.checkbox(f"{label} Empty", value=True, key=f"{key}_empty"):
-        st.session_state[f"{key}_qty"] = 0
+    if remember(f"{key}_empty", st.checkbox(f"{label} Empty", value=recall(f"{key}_empty", True), key=f"{key}_empty")):
+        st.session_state[QTY_KEYS[key]] = 0
         st.info("0 KG")
-        return
+        return None, None
 
     # Determine Labels
     if tank_name == "Center":
@@ -142,32 +283,21 @@ def render_mli_input(label, key, tank_name):
         pitch_label = "Pitch Attitude"
 
     # 1. Select MLI
-    tank_data = df_db[df_db['Tank'] == tank_name]
-    valid_mlis = sorted(tank_data['MLI'].unique())
+    valid_mlis = mlis_by_tank[tank_name]
     
     c1, c2 = st.columns(2)
     with c1:
-        mli_val = st.selectbox(mli_label, valid_mlis, key=f"{key}_mli")
+        mli_val = remember(f"{key}_mli", st.selectbox(mli_label, valid_mlis, index=recall_index(f"{key}_mli", valid_mlis), key=f"{key}_mli"))
     
     # 2. Select Pitch
-    def safe_sort_key(val):
-        try: return (0, float(val))
-        except: return (1, str(val))
-
-    mli_scope = tank_data[tank_data['MLI'] == mli_val]
-    valid_pitches = sorted(mli_scope['Pitch'].unique(), key=safe_sort_key)
-    
-    # Default Pitch
-    p_index = 0
-    for i, p in enumerate(valid_pitches):
-        if str(p).replace('.0','').strip() in ["0", "1"]: p_index = i
+    valid_pitches, p_index = pitches_by.get((tank_name, mli_val), ((), 0))
 
     with c2:
-        pitch_val = st.selectbox(pitch_label, valid_pitches, index=p_index, key=f"{key}_pitch")
+        p_index = recall_index(f"{key}_pitch", valid_pitches, p_index)
+        pitch_val = remember(f"{key}_pitch", st.selectbox(pitch_label, valid_pitches, index=p_index, key=f"{key}_pitch"))
 
     # 3. Select Roll
-    pitch_scope = mli_scope[mli_scope['Pitch'] == pitch_val]
-    valid_rolls = sorted(pitch_scope['Roll'].unique())
+    valid_rolls, r_index = rolls_by.get((tank_name, mli_val, pitch_val), ((), 0))
     
     c3, c4 = st.columns(2)
     with c3:
@@ -175,82 +305,71 @@ def render_mli_input(label, key, tank_name):
             roll_val = 0.0
             st.info("Roll: 0.0 (Fixed)")
         elif len(valid_rolls) > 1 or (len(valid_rolls)==1 and valid_rolls[0] != 0):
-            r_index = 0
-            if 0.0 in valid_rolls: r_index = valid_rolls.index(0.0)
-            roll_val = st.selectbox("Roll Attitude", valid_rolls, index=r_index, key=f"{key}_roll")
+            r_index = recall_index(f"{key}_roll", valid_rolls, r_index)
+            roll_val = remember(f"{key}_roll", st.selectbox("Roll Attitude", valid_rolls, index=r_index, key=f"{key}_roll"))
         else:
             roll_val = 0.0
             st.info("Roll: 0.0 (Fixed)")
 
     # 4. Select Reading
-    final_scope = pitch_scope[np.isclose(pitch_scope['Roll'], roll_val, atol=0.01)]
-    valid_readings = sorted(final_scope['Reading'].unique())
+    valid_readings = readings_by_key.get((tank_name, mli_val, pitch_val, roll_key(roll_val)), [])
     
     with c4:
-        if not valid_readings:
+        if len(valid_readings) == 0:
+            # Nothing to look up: no reading means no quantity
             st.warning("No Data")
-            reading_val = 0.0
+            st.session_state[QTY_KEYS[key]] = 0
+            return None, None
+        r_index = recall_index(f"{key}_read", valid_readings)
+        reading_val = remember(f"{key}_read", st.selectbox("Reading (mm)", valid_readings, index=r_index, key=f"{key}_read"))
+
+    return (tank_name, mli_val, pitch_val, roll_val, reading_val), st.container()
+
+# Stores the KG quantity; the result is only drawn for tanks on the active tab
+def render_mli_result(key, qty_litres, slot):
+    qty_kg = 0 if qty_litres is None else int(qty_litres * sg_val)
+    st.session_state[QTY_KEYS[key]] = qty_kg
+    if slot is None: return
+    with slot:
+        if qty_litres is not None:
+            st.success(f"✅ {qty_kg} KG")
+            st.caption(f"{qty_litres} Litres × {sg_val} SG")
         else:
-            reading_val = st.selectbox("Reading (mm)", valid_readings, key=f"{key}_read")
-            
-    # Calculation
-    qty_litres = get_fuel_qty(mli_val, pitch_val, roll_val, reading_val, tank_name)
-    
-    if qty_litres is not None:
-        qty_kg = qty_litres * sg_val
-        st.success(f"✅ {int(qty_kg)} KG")
-        st.caption(f"{int(qty_litres)} Litres × {sg_val} SG")
-        st.session_state[f"{key}_qty"] = qty_kg
-    else:
-        st.error("Not Found")
-        st.session_state[f"{key}_qty"] = 0
+            st.error("Not Found")
 
 # Render Tabs
-with t1: render_mli_input("Left Wing", "left", "Left")
-with t3: render_mli_input("Right Wing", "right", "Right")
+# A fragment: widget changes inside the tabs rerun only this function, not the whole
+# script. The totalizer is drawn inside it (above the tabs, filled last) so a
+# fragment rerun refreshes the panel without a full rerun.
+@st.fragment
+def render_tabs():
+    totalizer_container = st.empty()
+    # A radio styled as a tab bar: unlike st.tabs, only the selected body executes
+    active_tab = st.radio("Tank", TABS, horizontal=True, key="active_tab", label_visibility="collapsed")
 
-with t2:
-    st.write("### Center Tank")
-    render_mli_input("Center Tank", "center", "Center")
-    st.markdown("---")
-    if not df_db[df_db['Tank']=='ACT'].empty:
-        st.write("### ACT (Rear)")
-        render_mli_input("ACT", "act", "ACT")
+    rendered = {}
+    if active_tab == "Left Wing":
+        rendered['left'] = render_mli_input("Left Wing", "left", "Left")
+    elif active_tab == "Right Wing":
+        rendered['right'] = render_mli_input("Right Wing", "right", "Right")
+    else:
+        st.write("### Center Tank")
+        rendered['center'] = render_mli_input("Center Tank", "center", "Center")
+        st.markdown("---")
+        if has_act:
+            st.write("### ACT (Rear)")
+            rendered['act'] = render_mli_input("ACT", "act", "ACT")
 
-# --- 10. UPDATE TOTALIZER ---
-total_fuel = st.session_state.left_qty + st.session_state.center_qty + st.session_state.right_qty + st.session_state.act_qty
-act_style_color = "#00FF00" if st.session_state.act_qty > 0 else "#555"
+    # Inactive tanks reuse their last query, so an SG change still reaches them
+    for key, (query, _) in rendered.items(): st.session_state[f"_{key}_query"] = query
+    queries = {key: st.session_state.get(f"_{key}_query") for key in QTY_KEYS}
+    queries = {key: query for key, query in queries.items() if query is not None}
 
-# NOTE: This HTML string is purposely left-aligned (no indentation) to fix display bugs
-ecam_content = f"""
-<div class="ecam-panel">
-<div class="ecam-header">
-<div style="display:flex; flex-direction:column;">
-<span class="ecam-label-fob">FOB:</span>
-</div>
-<div style="display:flex; align-items:baseline;">
-<span class="ecam-total">{int(total_fuel):,}</span>
-<span class="ecam-unit">KG</span>
-</div>
-</div>
-<div class="ecam-tanks">
-<div class="tank-box">
-<span class="tank-name">LEFT</span>
-<span class="tank-val">{int(st.session_state.left_qty)}</span>
-</div>
-<div class="tank-box">
-<span class="tank-name">CTR</span>
-<span class="tank-val">{int(st.session_state.center_qty)}</span>
-</div>
-<div class="tank-box">
-<span class="tank-name">RIGHT</span>
-<span class="tank-val">{int(st.session_state.right_qty)}</span>
-</div>
-</div>
-<div class="ecam-act" style="color: {act_style_color};">
-ACT: {int(st.session_state.act_qty)}
-</div>
-</div>
-"""
+    # One batched lookup for every non-empty tank, then fill the active tab's result slots
+    results = batch_lookup(list(queries.values()))
+    for key, qty_litres in zip(queries, results):
+        render_mli_result(key, qty_litres, rendered.get(key, (None, None))[1])
+
+    render_totalizer(totalizer_container)
 
-totalizer_container.markdown(ecam_content, unsafe_allow_html=True)
\ No newline at end of file
+render_tabs()
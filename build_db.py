@@ -0,0 +1,163 @@
+import os
+import logging
+import shutil
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+try:
+    from numba import njit
+except ImportError:
+    njit = None  # optional: without it, large tables fall back to scan_qty()
+
+logger = logging.getLogger(__name__)
+
+# --- 1. FILES ---
+CSV_FILE = 'Airbus_Fuel_Data.csv'
+PARQUET_FILE = 'Airbus_Fuel_Data.parquet'
+DATASET_DIR = 'fuel_ds'
+COLUMNS = ['Tank', 'MLI', 'Pitch', 'Roll', 'Reading', 'Qty']
+
+# --- 2. CLEAN ---
+def safe_sort_key(val):
+    try: return (0, float(val))
+    except: return (1, str(val))
+
+# Parse-time types: labels as text, blanks and the usual placeholders as NA.
+# Pitch is numeric in the CSV and is labelled by its float text ("0.0", "1.5").
+CSV_DTYPES = {'Tank': 'string', 'MLI': 'string'}
+NUMERIC_COLUMNS = ['Pitch', 'Roll', 'Reading', 'Qty']
+NA_VALUES = ['nan', 'NaN', 'NAN', 'N/A', 'n/a', 'NA', '-', '--']
+
+def clean_csv(file_name=CSV_FILE):
+    db = pd.read_csv(file_name, usecols=COLUMNS, dtype=CSV_DTYPES,
+                     na_values=NA_VALUES, skipinitialspace=True)
+    # Clean columns already parse as floats (a no-op here); a stray non-numeric
+    # cell becomes NA and drops its row instead of failing the whole table
+    for col in NUMERIC_COLUMNS:
+        db[col] = pd.to_numeric(db[col], errors='coerce')
+    # Typed schema: no nulls allowed in any column
+    db = db.dropna()
+    db['Roll'] = db['Roll'].round(2).astype('float32')
+    db['Reading'] = db['Reading'].round(1).astype('float32')
+    # Smallest integer type that holds the litres (int16 for this table)
+    db['Qty'] = pd.to_numeric(db['Qty'].astype('int32'), downcast='integer')
+    db['Pitch'] = db['Pitch'].astype(str)
+    for col in ['Tank', 'MLI']:
+        db[col] = db[col].str.strip()
+
+    # Categoricals: equality masks compare integer codes instead of strings
+    db['Tank'] = db['Tank'].astype('category')
+    db['MLI'] = db['MLI'].astype('category')
+    pitches = sorted(db['Pitch'].unique(), key=safe_sort_key)
+    db['Pitch'] = pd.Categorical(db['Pitch'], categories=pitches, ordered=True)
+    return db[COLUMNS]
+
+def add_keys(db):
+    # Integer keys: Roll in 0.01 deg, Reading in 0.1 mm, so matching is exact equality
+    db['Roll_i'] = np.round(db['Roll'].to_numpy(dtype='float64') * 100).astype(np.int16)
+    db['Reading_i'] = np.round(db['Reading'].to_numpy(dtype='float64') * 10).astype(np.int16)
+    return db
+
+# --- 3. CONVERT ---
+def convert_csv(src=CSV_FILE):
+    return pa.Table.from_pandas(clean_csv(src), preserve_index=False)
+
+def write_parquet(table, dst=PARQUET_FILE):
+    # Written aside and swapped in: a killed or concurrent conversion never leaves a
+    # truncated file behind (the temp name is per process)
+    tmp = f"{dst}.{os.getpid()}.tmp"
+    try:
+        pq.write_table(table, tmp, compression='snappy', use_dictionary=['MLI', 'Pitch', 'Tank'])
+        os.replace(tmp, dst)
+    except OSError:
+        if os.path.exists(tmp): os.remove(tmp)
+        raise
+    # The scan dataset is derived from this file; open_dataset() rebuilds it on demand
+    open_dataset.cache_clear()
+    scan_qty.cache_clear()
+
+def build_parquet(src=CSV_FILE, dst=PARQUET_FILE):
+    write_parquet(convert_csv(src), dst)
+
+def read_parquet(src=PARQUET_FILE):
+    return pq.read_table(src, columns=COLUMNS).to_pandas()
+
+def load_table(src=CSV_FILE, dst=PARQUET_FILE):
+    # The cleaned table: from the Parquet file when it is current and readable,
+    # otherwise re-converted from the CSV
+    if not is_stale(src, dst):
+        try: return read_parquet(dst)
+        except Exception: logger.warning("%s is unreadable, rebuilding it from %s", dst, src, exc_info=True)
+    try:
+        table = convert_csv(src)
+    except FileNotFoundError:
+        # No CSV to rebuild from: an existing Parquet file is still the best source
+        logger.warning("%s not found, using %s as is", src, dst)
+        return read_parquet(dst)
+    try:
+        write_parquet(table, dst)
+    except OSError:
+        # e.g. a read-only directory: the conversion is still good in memory
+        logger.warning("Could not write %s, using the CSV conversion in memory", dst, exc_info=True)
+    return table.to_pandas()
+
+def build_dataset(src=PARQUET_FILE, dst=DATASET_DIR):
+    # One directory per Tank, rows sorted by MLI/Pitch inside it: a filtered scan opens
+    # a single partition and row-group statistics skip the chunks that can't match
+    db = add_keys(pq.read_table(src, columns=COLUMNS).to_pandas())
+    db = db.sort_values(['Tank', 'MLI', 'Pitch', 'Roll_i', 'Reading_i'])
+    for col in ['Tank', 'MLI', 'Pitch']:
+        db[col] = db[col].astype(str)
+    # Written aside and swapped in, so a failed write never leaves a partial dataset
+    tmp = dst + '.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    pq.write_to_dataset(pa.Table.from_pandas(db, preserve_index=False), root_path=tmp, partition_cols=['Tank'])
+    shutil.rmtree(dst, ignore_errors=True)
+    os.replace(tmp, dst)
+
+# --- 4. QUERY ---
+# Only tables too large for the app's in-memory dict are scanned, so the dataset
+# is built on first use rather than with the Parquet file
+@lru_cache(maxsize=None)
+def open_dataset(src=DATASET_DIR):
+    if not os.path.isdir(src) or os.path.getmtime(src) < os.path.getmtime(PARQUET_FILE):
+        build_dataset(dst=src)
+    return ds.dataset(src, format='parquet', partitioning='hive')
+
+# Keyed on the quantized ints, so float jitter can't split cache entries
+@lru_cache(maxsize=4096)
+def scan_qty(tank, mli, pitch, roll_i, reading_i):
+    # Predicate pushdown: only the matching rows are decoded
+    match = ((ds.field('Tank') == tank) & (ds.field('MLI') == mli) & (ds.field('Pitch') == pitch)
+             & (ds.field('Roll_i') == roll_i) & (ds.field('Reading_i') == reading_i))
+    qty = open_dataset().to_table(filter=match, columns=['Qty']).column('Qty')
+    return qty[0].as_py() if len(qty) else None
+
+def code_columns(db):
+    # C-contiguous integer columns (category codes + quantized keys) for find_qty()
+    keys = [db[c].cat.codes for c in ['Tank', 'MLI', 'Pitch']] + [db['Roll_i'], db['Reading_i']]
+    return tuple(np.ascontiguousarray(k.to_numpy(), dtype=np.int16) for k in keys) + \
+        (np.ascontiguousarray(db['Qty'].to_numpy(), dtype=np.int32),)
+
+def _find_qty(tank_c, mli_c, pitch_c, roll_i, reading_i, qty, tc, mc, pc, ri, rdi):
+    # One fused pass over the code columns: no boolean masks, stops at the first hit
+    for i in range(tank_c.shape[0]):
+        if tank_c[i] == tc and mli_c[i] == mc and pitch_c[i] == pc and roll_i[i] == ri and reading_i[i] == rdi:
+            return qty[i]
+    return -1
+
+find_qty = njit(cache=True)(_find_qty) if njit is not None else None
+
+def is_stale(src=CSV_FILE, dst=PARQUET_FILE):
+    if not os.path.exists(dst): return True
+    # A newer CSV or a newer converter (schema change) both invalidate the file
+    built = os.path.getmtime(dst)
+    if os.path.getmtime(__file__) > built: return True
+    return os.path.exists(src) and os.path.getmtime(src) > built
+
+if __name__ == "__main__":
+    build_parquet()
+    print(f"Wrote {PARQUET_FILE}")